@@ -1,6 +1,7 @@
 from skyfield.api import load, Topos
 from datetime import datetime, timedelta
 import json
+import numpy as np
 
 # Load planetary data
 planets = load('de421.bsp')
@@ -21,63 +22,91 @@ planetary_objects = {name: planets[planet_names[name]] for name in planet_names}
 earth = planets['earth']
 observer = earth + Topos(latitude_degrees=0, longitude_degrees=0)
 
-# Function to calculate aspects
-def calculate_aspects(date):
-    ts = load.timescale()
-    t = ts.utc(date.year, date.month, date.day)
-    positions = {name: observer.at(t).observe(planet).apparent().ecliptic_latlon()[1].degrees for name, planet in planetary_objects.items()}
-    
+# Load the timescale once and reuse it for every date
+ts = load.timescale()
+
+# Define aspects by their ideal angle of separation
+aspect_angles = {
+    "conjunction": 0,
+    "opposition": 180,
+    "trine": 120,
+    "square": 90,
+    "sextile": 60,
+    "quincunx": 150,
+    "quintile": 72,
+    "semi-sextile": 30,
+    "semi-square": 45,
+    "sesquiquadrate": 135
+}
+aspect_tolerance = 8  # Degrees of tolerance for aspects
+
+# Aspect lookups only depend on the fixed aspect list
+aspect_names = list(aspect_angles)
+aspect_ideals = np.array([aspect_angles[aspect] for aspect in aspect_names])
+
+# Function to calculate ecliptic longitudes for a list of dates in one batch
+def calculate_positions(dates):
+    t = ts.utc([date.year for date in dates], [date.month for date in dates], [date.day for date in dates])
+    # The observer's position is the same for every planet, so compute it once
+    observer_at_t = observer.at(t)
+    return {name: observer_at_t.observe(planet).apparent().ecliptic_latlon()[1].degrees for name, planet in planetary_objects.items()}
+
+# Function to calculate aspects from the ecliptic longitudes of a single date
+def calculate_aspects(positions):
     aspects = []
-    aspect_angles = {
-        "conjunction": 0,
-        "opposition": 180,
-        "trine": 120,
-        "square": 90,
-        "sextile": 60,
-        "quincunx": 150,
-        "quintile": 72,
-        "semi-sextile": 30,
-        "semi-square": 45,
-        "sesquiquadrate": 135
-    }
-    aspect_tolerance = 8  # Degrees of tolerance for aspects
-    
-    for planet1, lon1 in positions.items():
-        for planet2, lon2 in positions.items():
-            if planet1 != planet2:
-                angle = abs(lon1 - lon2)
-                for aspect, aspect_angle in aspect_angles.items():
-                    if abs(angle - aspect_angle) <= aspect_tolerance or abs((angle + 360) - aspect_angle) <= aspect_tolerance:
-                        aspects.append({
-                            "planet1": planet1,
-                            "planet2": planet2,
-                            "aspect": aspect,
-                            "angle": angle
-                        })
+    names = list(positions)
+    lons = np.array([positions[name] for name in names])
+
+    # Shortest-arc separation between every pair of planets (longitudes are already in [0, 360))
+    sep = np.abs(lons[:, None] - lons[None, :])
+    sep = np.minimum(sep, 360 - sep)
+
+    # Orb of every pair against every aspect, keeping only the closest aspect within tolerance
+    orbs = np.abs(sep[:, :, None] - aspect_ideals[None, None, :])
+    orbs = np.where(orbs <= aspect_tolerance, orbs, np.inf)
+    best_idx = orbs.argmin(axis=2)
+    best_orb = orbs.min(axis=2)
+
+    # Each unordered pair once, keeping only pairs with an aspect in orb
+    pairs_i, pairs_j = np.triu_indices(len(names), k=1)
+    in_orb = best_orb[pairs_i, pairs_j] < np.inf
+    for i, j in zip(pairs_i[in_orb], pairs_j[in_orb]):
+        aspects.append({
+            "planet1": names[i],
+            "planet2": names[j],
+            "aspect": aspect_names[best_idx[i, j]],
+            "angle": float(sep[i, j])
+        })
     return aspects
 
 # Function to fetch aspects for the current week
 def fetch_weekly_aspects(start_date, days=7):
+    dates = [start_date + timedelta(days=i) for i in range(days)]
+    if not dates:
+        return []
+    longitudes = calculate_positions(dates)
     weekly_aspects = []
-    for i in range(days):
-        date = start_date + timedelta(days=i)
-        aspects = calculate_aspects(date)
+    for i, date in enumerate(dates):
+        aspects = calculate_aspects({name: lons[i] for name, lons in longitudes.items()})
         weekly_aspects.append({
             "date": date.strftime('%Y-%m-%d'),
             "aspects": aspects
         })
     return weekly_aspects
 
-# Fetch data starting from today
-start_date = datetime.now()
-weekly_aspects = fetch_weekly_aspects(start_date)
-
-# Save the data to a JSON file
+# Save the data to a JSON file, returning the serialized text so it can be reused
 def save_to_json(data, filename="weekly_aspects.json"):
+    text = json.dumps(data, indent=4)
     with open(filename, 'w') as f:
-        json.dump(data, f, indent=4)
+        f.write(text)
+    return text
+
+if __name__ == "__main__":
+    # Fetch data starting from today
+    start_date = datetime.now()
+    weekly_aspects = fetch_weekly_aspects(start_date)
 
-save_to_json({"weekly_aspects": weekly_aspects})
+    payload = save_to_json({"weekly_aspects": weekly_aspects})
 
-# Print the fetched data for verification
-print(json.dumps({"weekly_aspects": weekly_aspects}, indent=4))
+    # Print the fetched data for verification
+    print(payload)